@@ -1,32 +1,84 @@
 from __future__ import annotations
 
+import contextlib
+import functools
 import json
 import os
-import subprocess
+import re
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 
 __all__ = [
+    "KEYWORD_GROUP",
     "Config",
     "die_missing",
+    "json_dumps",
+    "json_loads",
+    "literal_alternation",
     "read_json",
     "read_text",
+    "write_bytes_atomic",
     "write_json_atomic",
     "now_iso_utc",
+    "open_text_atomic",
 ]
 
+# Name of the filter_rx group that marks a keyword hit (company groups are _c0, _c1, ...).
+KEYWORD_GROUP = "_kw"
+
+
+def literal_alternation(words: Iterable[str]) -> str:
+    """Regex for any of words, lowercased and factored into a prefix trie.
+
+    "question|questions|oa|onsite" becomes "(?:o(?:a|nsite)|question(?:s)?)", so
+    shared prefixes are matched once per position instead of once per word.
+    """
+    trie: Dict[str, Any] = {}
+    for w in dict.fromkeys(w.lower() for w in words):
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1 and "" not in node:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")" + ("?" if "" in node else "")
+
+    return build(trie)
+
 
 def die_missing(path: Path, hint: str) -> None:
     if not path.exists():
         raise FileNotFoundError(f"Missing file: {path}\nHint: {hint}")
 
 
+def json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 def read_json(path: Path) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return json_loads(path.read_bytes())
 
 
 def read_text(path: Path) -> str:
@@ -34,11 +86,40 @@ def read_text(path: Path) -> str:
         return f.read()
 
 
-def write_json_atomic(path: Path, payload: Any) -> None:
+def _mkstemp_sibling(path: Path) -> tuple[int, Path]:
+    # A unique name per write, so overlapping runs never share a temp file.
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    # mkstemp creates it 0600; published files need the usual world-readable mode.
+    os.chmod(name, 0o644)
+    return fd, Path(name)
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = _mkstemp_sibling(path)
+    try:
+        with open(fd, "wb") as f:
+            f.write(data)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(path)
+
+
+def write_json_atomic(path: Path, payload: Any) -> None:
+    write_bytes_atomic(path, json_dumps(payload))
+
+
+@contextlib.contextmanager
+def open_text_atomic(path: Path, buffering: int = -1) -> Iterator[TextIO]:
+    """Open a temp file for streaming text; it replaces path only if the block succeeds."""
+    fd, tmp = _mkstemp_sibling(path)
+    try:
+        with open(fd, "w", encoding="utf-8", buffering=buffering) as f:
+            yield f
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
     tmp.replace(path)
 
 
@@ -59,6 +140,7 @@ class Config:
 
     cse_id: str
     cse_key: str
+    cse_cache_dir: Optional[Path]
     page_title: str
     page_noindex: bool
     company_order: List[str]
@@ -71,6 +153,10 @@ class Config:
     allow_patterns: List[str]
     keyword_words: List[str]
 
+    allow_rx: re.Pattern[str]
+    filter_rx: re.Pattern[str]
+    company_groups: Dict[str, str]
+
     output_html: Path
     manifest_path: Path
     json_randomize: bool
@@ -78,22 +164,17 @@ class Config:
     json_salt: str
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def detect_project_root() -> Path:
         ws = os.environ.get("GITHUB_WORKSPACE")
         if ws and Path(ws).exists():
             return Path(ws).resolve()
-        try:
-            top = (
-                subprocess.check_output(
-                    ["git", "rev-parse", "--show-toplevel"], stderr=subprocess.DEVNULL
-                )
-                .decode()
-                .strip()
-            )
-            if top and Path(top).exists():
-                return Path(top).resolve()
-        except Exception:
-            pass
+        # Same answer as `git rev-parse --show-toplevel`, without forking git:
+        # the nearest ancestor of the working directory holding .git (dir or file).
+        cwd = Path.cwd().resolve()
+        for parent in (cwd, *cwd.parents):
+            if (parent / ".git").exists():
+                return parent
         return Path(__file__).resolve().parent.parent
 
     @classmethod
@@ -124,6 +205,8 @@ class Config:
 
         cse_id = os.environ["CSE_ID"]
         cse_key = os.environ["CSE_KEY"]
+        # Opt-in cache of raw CSE responses, keyed by day, for cheap local re-runs.
+        cse_cache_dir = root / ".cache" / "cse" if os.getenv("CSE_CACHE") == "1" else None
 
         page_title = settings.get("page", {}).get("title", "FAANG Discuss Daily")
         page_noindex = bool(settings.get("page", {}).get("noindex", True))
@@ -149,6 +232,24 @@ class Config:
             ["onsite", "phone", "screen", "oa", "interview", "experience", "question", "questions"],
         )
 
+        # Keywords and company aliases share one alternation so each item is scanned
+        # once: the KEYWORD_GROUP marks a keyword hit, and one synthetic named group
+        # per company (_c0, _c1, ...) identifies the company via company_groups.
+        # Patterns are lowercase and compiled case-sensitively; callers lowercase the
+        # text once, which is cheaper than re.I folding every comparison.
+        company_groups = {
+            f"_c{i}": c for i, c in enumerate(companies_aliases) if companies_aliases[c]
+        }
+        branches = [
+            rf"\b(?P<{KEYWORD_GROUP}>" + literal_alternation(keyword_words) + r")\b",
+            *(
+                f"(?P<{g}>" + literal_alternation(companies_aliases[c]) + ")"
+                for g, c in company_groups.items()
+            ),
+        ]
+        filter_rx = re.compile("|".join(branches))
+        allow_rx = re.compile("|".join(allow_patterns), re.I)
+
         output_html = root / Path(settings.get("output", {}).get("html", "index.html"))
         manifest_path = root / Path(
             settings.get("output", {}).get("json_manifest", "data/manifest.json")
@@ -170,6 +271,7 @@ class Config:
             settings=settings,
             cse_id=cse_id,
             cse_key=cse_key,
+            cse_cache_dir=cse_cache_dir,
             page_title=page_title,
             page_noindex=page_noindex,
             company_order=company_order,
@@ -179,6 +281,9 @@ class Config:
             q_intents=q_intents,
             allow_patterns=allow_patterns,
             keyword_words=keyword_words,
+            allow_rx=allow_rx,
+            filter_rx=filter_rx,
+            company_groups=company_groups,
             output_html=output_html,
             manifest_path=manifest_path,
             json_randomize=json_randomize,
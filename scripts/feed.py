@@ -3,16 +3,17 @@
 
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List
 import os
 
 from scripts.config_loader import Config
 from scripts.fetcher import Fetcher
+from scripts.models import Item
 from scripts.renderer import Renderer
 from scripts.summarize import render_rules_summary, render_openai_summary
 
 
-def make_summary(items: List[Dict[str, Any]]) -> str:
+def make_summary(items: List[Item]) -> str:
     api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
     if api_key and render_openai_summary is not None:
         try:
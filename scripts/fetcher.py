@@ -1,20 +1,43 @@
 from __future__ import annotations
 
-import json
-import re
-import time
-import urllib.parse
-import urllib.request
+import itertools
+import queue
 import urllib.error
-from typing import Any, Dict, List, cast
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Set, cast
+from dataclasses import dataclass, field
+from datetime import date
 
-from scripts.config_loader import Config, now_iso_utc
+from scripts.config_loader import (
+    KEYWORD_GROUP,
+    Config,
+    json_loads,
+    now_iso_utc,
+    read_json,
+    write_bytes_atomic,
+)
+from scripts.models import Item
+
+if TYPE_CHECKING:
+    import http.client
+
+# CSE serves at most 100 results, 10 per page: start=1, 11, ..., 91.
+CSE_PAGE_SIZE = 10
+CSE_MAX_START = 91
+CSE_HOST = "www.googleapis.com"
+CSE_PATH = "/customsearch/v1"
+# Pages in flight at once; stays well inside CSE's per-minute query quota.
+CSE_CONCURRENCY = 4
 
 
 @dataclass
 class Fetcher:
     cfg: Config
+    # Idle keep-alive connections; grows to at most one per concurrent page.
+    _pool: queue.SimpleQueue[http.client.HTTPSConnection] = field(
+        default_factory=queue.SimpleQueue, init=False, repr=False
+    )
 
     def _build_query(self) -> str:
         companies = "(" + " OR ".join(self.cfg.q_companies) + ")"
@@ -31,96 +54,194 @@ class Fetcher:
             "sort": "date",
             "safe": "off",
         }
-        url = "https://www.googleapis.com/customsearch/v1?" + urllib.parse.urlencode(params)
-        with urllib.request.urlopen(url, timeout=30) as resp:
-            return cast(Dict[str, Any], json.loads(resp.read().decode("utf-8")))
-
-    def fetch(self) -> List[Dict[str, Any]]:
-        company_rx = {
-            c: re.compile(r"|".join(map(re.escape, v)), re.I)
-            for c, v in self.cfg.companies_aliases.items()
-        }
-        allow_rx = re.compile("|".join(self.cfg.allow_patterns), re.I)
-        keywords_rx = re.compile(
-            r"\b(" + "|".join(map(re.escape, self.cfg.keyword_words)) + r")\b", re.I
-        )
-
-        def detect_company(text: str | None) -> str | None:
-            s = text or ""
-            for c, rx in company_rx.items():
-                if rx.search(s):
-                    return c
-            return None
+        cache_file = None
+        if self.cfg.cse_cache_dir is not None:
+            import hashlib
 
-        q = self._build_query()
-        items: List[Dict[str, Any]] = []
-        start = 1
-        cse_failed = False
+            key = f"{date.today().isoformat()}|{self.cfg.cse_id}|{q}|{start}|{num}"
+            cache_file = self.cfg.cse_cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+            if cache_file.exists():
+                return cast(Dict[str, Any], json_loads(cache_file.read_bytes()))
+
+        # Only a real network round-trip needs these; cache hits never import them.
+        import http.client
+        import io
+        import urllib.parse
 
-        while len(items) < self.cfg.max_results and start <= 91:
+        url = CSE_PATH + "?" + urllib.parse.urlencode(params)
+        while True:
             try:
-                data = self._cse(q, start=start, num=10)
-            except urllib.error.HTTPError as e:
-                print("HTTPError:", e.read())
-                cse_failed = True
-                break
-            except Exception as e:
-                print("Fetch error:", e)
-                cse_failed = True
+                conn, reused = self._pool.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(), False
+            try:
+                conn.request("GET", url)
+                resp = conn.getresponse()
+                body = resp.read()
                 break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # An idle keep-alive connection may have been dropped server-side; retry.
+                # Anything else (a timeout in particular) is not retried.
+                if not reused:
+                    raise
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+        self._pool.put(conn)
+        if resp.status != 200:
+            raise urllib.error.HTTPError(
+                f"https://{CSE_HOST}{url}", resp.status, resp.reason, resp.headers, io.BytesIO(body)
+            )
+        data = cast(Dict[str, Any], json_loads(body))
+        if cache_file is not None:
+            write_bytes_atomic(cache_file, body)
+        return data
 
-            for it in data.get("items", []):
-                link = it.get("link", "")
-                title = it.get("title", "")
-                snippet = it.get("snippet", "")
-                if not link or not allow_rx.search(link):
-                    continue
-                combo = f"{title} {snippet} {link}"
-                if not keywords_rx.search(combo):
-                    continue
-                company = detect_company(combo)
-                if not company:
+    def _connect(self) -> http.client.HTTPSConnection:
+        import http.client
+        import urllib.parse
+        import urllib.request
+
+        # http.client ignores HTTPS_PROXY/NO_PROXY; honour them the way urlopen
+        # does, by tunnelling through the proxy with CONNECT.
+        proxy = urllib.request.getproxies().get("https")
+        if not proxy or urllib.request.proxy_bypass(CSE_HOST):
+            return http.client.HTTPSConnection(CSE_HOST, timeout=30)
+        p = urllib.parse.urlsplit(proxy if "://" in proxy else "http://" + proxy)
+        # A port-less proxy means port 80, as with urlopen (not HTTPS's 443).
+        conn = http.client.HTTPSConnection(p.hostname or "", p.port or 80, timeout=30)
+        headers: Dict[str, str] = {}
+        if p.username:
+            import base64
+
+            creds = f"{urllib.parse.unquote(p.username)}:{urllib.parse.unquote(p.password or '')}"
+            headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode()).decode()
+        conn.set_tunnel(CSE_HOST, 443, headers=headers)
+        return conn
+
+    def _close_pool(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def fetch(self) -> List[Item]:
+        allow_rx = self.cfg.allow_rx
+        filter_rx = self.cfg.filter_rx
+        company_groups = self.cfg.company_groups
+
+        def scan(*fields: str) -> str | None:
+            """Return the first company across fields, provided they also contain a keyword.
+
+            Fields are scanned one at a time and the scan stops as soon as both are
+            found, so later (longer) fields are often never lowercased or searched.
+            """
+            has_keyword, company = False, None
+            for text in fields:
+                if not text:
                     continue
-                items.append(
-                    {
-                        "title": title,
-                        "url": link,
-                        "snippet": snippet,
-                        "company": company,
-                        "first_seen": now_iso_utc(),
-                    }
+                for m in filter_rx.finditer(text.lower()):
+                    g = m.lastgroup
+                    if g == KEYWORD_GROUP:
+                        has_keyword = True
+                    elif company is None and g:
+                        company = company_groups[g]
+                    if has_keyword and company:
+                        return company
+            return None
+
+        q = self._build_query()
+        items: List[Item] = []
+        seen: Set[str] = set()
+        cse_failed = False
+        # Every item in one fetch shares the same ingestion time.
+        first_seen = now_iso_utc()
+
+        # Pages are independent offsets of the same query, so fetch them
+        # concurrently and merge in offset order as they arrive; wall time is
+        # ~one RTT per CSE_CONCURRENCY pages, not one per page. Most raw results
+        # fail the filters, so paging continues up to CSE_MAX_START until
+        # max_results items pass; at most CSE_CONCURRENCY pages are requested
+        # ahead of the one being merged, which bounds quota spent past the stop.
+        starts = iter(range(1, CSE_MAX_START + 1, CSE_PAGE_SIZE))
+        if self.cfg.max_results <= 0 or not self.cfg.q_intents:
+            # Nothing to ask CSE for: spend no request (or quota) finding out,
+            # but still fall back to the last published feed below.
+            starts = iter(())
+        try:
+            with ThreadPoolExecutor(max_workers=CSE_CONCURRENCY) as ex:
+                futures = deque(
+                    ex.submit(self._cse, q, start, CSE_PAGE_SIZE)
+                    for start in itertools.islice(starts, CSE_CONCURRENCY)
                 )
 
-            start += 10
-            time.sleep(0.6)
-            if len(items) >= self.cfg.max_results:
-                break
-            if data.get("searchInformation", {}).get("totalResults") == "0":
-                break
+                while futures:
+                    fut = futures.popleft()
+                    start = next(starts, None)
+                    if start is not None:
+                        futures.append(ex.submit(self._cse, q, start, CSE_PAGE_SIZE))
+                    try:
+                        data = fut.result()
+                    except urllib.error.HTTPError as e:
+                        print("HTTPError:", e.read())
+                        cse_failed = True
+                        break
+                    except Exception as e:
+                        print("Fetch error:", e)
+                        cse_failed = True
+                        break
+
+                    for it in data.get("items", []):
+                        # Cheapest and most selective checks first: most results die on the link.
+                        link = it.get("link", "")
+                        if not link or link in seen or not allow_rx.search(link):
+                            continue
+                        title = it.get("title", "")
+                        snippet = it.get("snippet", "")
+                        # Title and link usually settle it; the long snippet is scanned last.
+                        company = scan(title, link, snippet)
+                        if not company:
+                            continue
+                        seen.add(link)
+                        items.append(
+                            Item(
+                                title=title,
+                                url=link,
+                                snippet=snippet,
+                                company=company,
+                                first_seen=first_seen,
+                            )
+                        )
+                        if len(items) >= self.cfg.max_results:
+                            break
+
+                    if len(items) >= self.cfg.max_results:
+                        break
+                    if data.get("searchInformation", {}).get("totalResults") == "0":
+                        break
 
-        seen, dedup = set(), []
-        for it in items:
-            u = it["url"]
-            if u in seen:
-                continue
-            seen.add(u)
-            dedup.append(it)
-        result = dedup[: self.cfg.max_results]
+                # After an early stop, pages still queued are not needed.
+                for fut in futures:
+                    fut.cancel()
+        finally:
+            # Every worker has exited (even on an unexpected error), so the idle
+            # keep-alive connections can go.
+            self._close_pool()
 
         # Fallback: if CSE failed or no items, load from manifest
-        if cse_failed or not result:
+        if cse_failed or not items:
             try:
-                manifest_path = self.cfg.manifest_path
-                with open(manifest_path, "r", encoding="utf-8") as f:
-                    manifest = json.load(f)
+                manifest = read_json(self.cfg.manifest_path)
                 json_path = manifest.get("json_path")
                 if json_path:
                     json_file = self.cfg.project_root / json_path
-                    with open(json_file, "r", encoding="utf-8") as jf:
-                        payload = json.load(jf)
-                    print(f"[fallback] Loaded {len(payload.get('items', []))} items from {json_file}")
-                    return payload.get("items", [])
+                    payload = read_json(json_file)
+                    fallback = [Item.from_dict(d) for d in payload.get("items", [])]
+                    print(f"[fallback] Loaded {len(fallback)} items from {json_file}")
+                    return fallback
             except Exception as e:
                 print(f"[fallback] Failed to load manifest/json: {e}")
                 return []
-        return result
+        return items
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+__all__ = ["Item"]
+
+
+@dataclass(slots=True)
+class Item:
+    title: str
+    url: str
+    snippet: str
+    company: str
+    first_seen: str
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Item":
+        # company and first_seen repeat across a whole feed; interning shares one
+        # object per value and lets per-company dict lookups match by identity.
+        return cls(
+            title=str(d.get("title", "")),
+            url=str(d.get("url", "")),
+            snippet=str(d.get("snippet", "")),
+            company=sys.intern(str(d.get("company", "Unknown"))),
+            first_seen=sys.intern(str(d.get("first_seen", ""))),
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "title": self.title,
+            "url": self.url,
+            "snippet": self.snippet,
+            "company": self.company,
+            "first_seen": self.first_seen,
+        }
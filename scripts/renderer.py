@@ -1,172 +1,224 @@
 from __future__ import annotations
 
+import functools
 import html
 import re
-import hashlib
-import secrets
-import string
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Optional, cast
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Optional, TextIO, cast
 
-from scripts.config_loader import Config, now_iso_utc, read_text, write_json_atomic
+from scripts.config_loader import (
+    Config,
+    now_iso_utc,
+    open_text_atomic,
+    read_json,
+    read_text,
+    write_json_atomic,
+)
+from scripts.models import Item
+
+Emit = Callable[[str], None]
+
+_DOM_ID_RE = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+@functools.lru_cache(maxsize=4)
+def _load_head(templates_dir: Path, page_title: str, noindex: bool) -> str:
+    head = read_text(templates_dir / "head.html")
+    head = head.replace("{{PAGE_TITLE}}", html.escape(page_title))
+    if noindex and 'name="robots"' not in head:
+        head = head.replace("</head>", '  <meta name="robots" content="noindex,nofollow">\n</head>')
+    return head
+
+
+@functools.lru_cache(maxsize=4)
+def _load_tail(templates_dir: Path) -> str:
+    return read_text(templates_dir / "tail.html")
+
+
+@functools.lru_cache(maxsize=2)
+def _salted_token(day_iso: str, salt: str) -> str:
+    import hashlib
+
+    return hashlib.sha256(f"{day_iso}::{salt}".encode("utf-8")).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=64)
+def _dom_id(name: str) -> str:
+    return "tab-" + _DOM_ID_RE.sub("-", name)
 
 
 @dataclass
 class Renderer:
     cfg: Config
+    # Templates only depend on config; _load_head/_load_tail cache them per process.
+    _head: str = field(init=False, repr=False)
+    _tail: str = field(init=False, repr=False)
+    _title_html: str = field(init=False, repr=False)
+    _company_html: Dict[str, str] = field(init=False, repr=False)
+    _company_order_set: FrozenSet[str] = field(init=False, repr=False)
+    # (st_mtime_ns, parsed data/summary.json); re-read only when the file changes.
+    _summary_cache: Optional[Tuple[int, Dict[str, Any]]] = field(
+        default=None, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._head = _load_head(self.cfg.templates_dir, self.cfg.page_title, self.cfg.page_noindex)
+        self._tail = _load_tail(self.cfg.templates_dir)
+        self._title_html = html.escape(self.cfg.page_title)
+        self._company_html = {c: html.escape(c) for c in self.cfg.company_order}
+        self._company_order_set = frozenset(self.cfg.company_order)
+
+    def _esc_company(self, name: str) -> str:
+        cached = self._company_html.get(name)
+        return cached if cached is not None else html.escape(name)
 
     def _daily_token(self) -> str:
         if not self.cfg.json_salt:
+            import secrets
+            import string
+
             alphabet = string.ascii_lowercase + string.digits
             return "".join(secrets.choice(alphabet) for _ in range(16))
-        payload = f"{date.today().isoformat()}::{self.cfg.json_salt}".encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()[:16]
+        return _salted_token(date.today().isoformat(), self.cfg.json_salt)
 
     def compute_json_path(self) -> Path:
         if not self.cfg.json_randomize:
             p = self.cfg.project_root / "data" / "latest.json"
             p.parent.mkdir(parents=True, exist_ok=True)
             return p
-        token = self._daily_token() if self.cfg.json_daily_stable else self._daily_token()
+        token = self._daily_token()
         p = self.cfg.project_root / "data" / token / f"{token}.json"
         p.parent.mkdir(parents=True, exist_ok=True)
         return p
 
-    def write_json_and_manifest(self, items: List[Dict[str, Any]]) -> Path:
+    def write_json_and_manifest(self, items: List[Item]) -> Path:
         json_abs = self.compute_json_path()
+        # One timestamp for both files, so the manifest matches the JSON it points to.
+        ts = now_iso_utc()
+        rel = json_abs.relative_to(self.cfg.project_root).as_posix()
         write_json_atomic(
             json_abs,
-            {"updated_at": now_iso_utc(), "count": len(items), "items": items},
+            {
+                "updated_at": ts,
+                "count": len(items),
+                "items": [it.to_dict() for it in items],
+            },
         )
         manifest_payload: Dict[str, Any] = {
-            "updated_at": now_iso_utc(),
-            "json_path": str(json_abs.relative_to(self.cfg.project_root).as_posix()),
+            "updated_at": ts,
+            "json_path": rel,
             "count": len(items),
         }
         write_json_atomic(self.cfg.manifest_path, manifest_payload)
         return json_abs
 
-    def _company_counts(self, items: List[Dict[str, Any]]) -> List[Tuple[str, int]]:
-        counts: Dict[str, int] = {}
-        for it in items:
-            c = str(it.get("company", "Unknown"))
-            counts[c] = counts.get(c, 0) + 1
-        return sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+    def _company_counts(self, items: List[Item]) -> List[Tuple[str, int]]:
+        # most_common sorts by count, ties in first-seen order, like the old stable sort.
+        return Counter(it.company for it in items).most_common()
 
     def _load_summary_json(self) -> Dict[str, Any]:
         p = self.cfg.project_root / "data" / "summary.json"
-        if not p.exists():
+        try:
+            mtime = p.stat().st_mtime_ns
+        except OSError:
             return {}
-        import json
-
-        with open(p, "r", encoding="utf-8") as f:
-            return cast(Dict[str, Any], json.load(f))
+        cached = self._summary_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        data = cast(Dict[str, Any], read_json(p))
+        self._summary_cache = (mtime, data)
+        return data
 
-    def _render_stats_cards(self, items: List[Dict[str, Any]]) -> str:
+    def _render_stats_cards(self, items: List[Item], emit: Emit) -> None:
         data = self._load_summary_json()
         counts_obj = data.get("company_counts")
         if not isinstance(counts_obj, dict) or not counts_obj:
-            return self._render_stats_list(items)
+            self._render_stats_list(items, emit)
+            return
         counts: Dict[str, int] = {str(k): int(v) for k, v in counts_obj.items()}
         if not counts:
-            return ""
+            return
         maxv = max(counts.values())
         ordered = [c for c in self.cfg.company_order if c in counts]
-        tail = [c for c in counts.keys() if c not in ordered]
-        ordered += tail
-        parts: List[str] = []
-        parts.append("<section class='trend-cards'>")
-        parts.append("<h2>🔥 Trend Stats</h2>")
-        parts.append("<div class='cards'>")
+        ordered += [c for c in counts if c not in self._company_order_set]
+        emit("<section class='trend-cards'>")
+        emit("<h2>🔥 Trend Stats</h2>")
+        emit("<div class='cards'>")
         for c in ordered:
             v = counts.get(c, 0)
             if v <= 0:
                 continue
             pct = int(round((v / maxv) * 100)) if maxv > 0 else 0
-            parts.append(
-                f"""
-<div class='stat-card'>
-  <div class='stat-head'>
-    <span class='stat-title'>{html.escape(c)}</span>
-    <span class='stat-value'>{v}</span>
-  </div>
-  <div class='stat-bar'><div class='stat-bar-fill' style='width:{pct}%;'></div></div>
-</div>
-""".strip()
+            emit(
+                "<div class='stat-card'>\n"
+                "  <div class='stat-head'>\n"
+                f"    <span class='stat-title'>{self._esc_company(c)}</span>\n"
+                f"    <span class='stat-value'>{v}</span>\n"
+                "  </div>\n"
+                "  <div class='stat-bar'>"
+                f"<div class='stat-bar-fill' style='width:{pct}%;'></div></div>\n"
+                "</div>"
             )
-        parts.append("</div></section>")
-        return "\n".join(parts)
+        emit("</div></section>")
 
-    def _render_stats_list(self, items: List[Dict[str, Any]]) -> str:
+    def _render_stats_list(self, items: List[Item], emit: Emit) -> None:
         counts = self._company_counts(items)
         if not counts:
-            return ""
-        parts: List[str] = []
-        parts.append("<section class='trend-stats'>")
-        parts.append("<h2>🔥 Trend Stats (by company)</h2>")
-        parts.append("<ul class='stats-list'>")
+            return
+        emit("<section class='trend-stats'>")
+        emit("<h2>🔥 Trend Stats (by company)</h2>")
+        emit("<ul class='stats-list'>")
         for company, cnt in counts:
-            parts.append(f"<li><strong>{html.escape(company)}</strong>: {cnt} posts</li>")
-        parts.append("</ul></section>")
-        return "\n".join(parts)
+            emit(f"<li><strong>{self._esc_company(company)}</strong>: {cnt} posts</li>")
+        emit("</ul></section>")
 
-    def _render_tabs_and_cards(self, items: List[Dict[str, Any]]) -> str:
-        groups: Dict[str, List[Dict[str, Any]]] = {}
+    def _render_tabs_and_cards(self, items: List[Item], emit: Emit) -> None:
+        # Buckets are pre-seeded in display order; companies outside company_order
+        # land in a throwaway bucket and are not rendered.
+        groups: Dict[str, List[Item]] = {c: [] for c in self.cfg.company_order}
+        unlisted: List[Item] = []
         for it in items:
-            groups.setdefault(str(it["company"]), []).append(it)
-
-        def dom_id(name: str) -> str:
-            return "tab-" + re.sub(r"[^a-zA-Z0-9_-]", "-", name)
+            groups.get(it.company, unlisted).append(it)
 
-        available = [c for c in self.cfg.company_order if c in groups and groups[c]]
+        available = [c for c, lst in groups.items() if lst]
 
-        out: List[str] = []
-        tabs: List[str] = ["<div class='tab' role='tablist' aria-label='Companies'>"]
+        emit("<div class='tab' role='tablist' aria-label='Companies'>")
         for c in available:
-            cid = dom_id(c)
-            tabs.append(
-                f"<button class='tablink' role='tab' aria-controls='{cid}' onclick=\"openCompany(event,'{cid}')\">{html.escape(c)}</button>"
+            cid = _dom_id(c)
+            emit(
+                f"<button class='tablink' role='tab' aria-controls='{cid}' onclick=\"openCompany(event,'{cid}')\">{self._esc_company(c)}</button>"
             )
-        tabs.append("</div>")
-        out.append("\n".join(tabs))
+        emit("</div>")
 
-        panes: List[str] = []
+        esc = html.escape
         for c in available:
-            cid = dom_id(c)
-            panes.append(
-                f"<div id='{cid}' class='tabcontent' role='tabpanel' aria-labelledby='{cid}-btn'>"
-            )
-            panes.append("<div class='grid'>")
+            cid = _dom_id(c)
+            emit(f"<div id='{cid}' class='tabcontent' role='tabpanel' aria-labelledby='{cid}-btn'>")
+            emit("<div class='grid'>")
             for it in groups[c]:
-                title = html.escape(str(it["title"]))
-                url = html.escape(str(it["url"]))
-                snippet = html.escape(str(it.get("snippet", "")))
-                panes.append(
+                emit(
                     "<div class='card'>"
-                    f"<div class='item-title'><a href='{url}' target='_blank' rel='noopener'>{title}</a></div>"
-                    f"<div class='snippet'>{snippet}</div>"
+                    f"<div class='item-title'><a href='{esc(it.url)}' target='_blank' rel='noopener'>{esc(it.title)}</a></div>"
+                    f"<div class='snippet'>{esc(it.snippet)}</div>"
                     "</div>"
                 )
-            panes.append("</div></div>")
-        out.append("\n".join(panes))
-        return "\n".join(out)
+            emit("</div></div>")
 
-    def _render_sample_questions(self, items: List[Dict[str, Any]], limit: int = 6) -> str:
-        parts: List[str] = []
-        parts.append("<section class='sample-questions'>")
-        parts.append("<h2>🔗 Sample Questions</h2>")
-        parts.append("<ul>")
+    def _render_sample_questions(self, items: List[Item], emit: Emit, limit: int = 6) -> None:
+        emit("<section class='sample-questions'>")
+        emit("<h2>🔗 Sample Questions</h2>")
+        emit("<ul>")
         for it in items[:limit]:
-            company = html.escape(str(it.get("company", "Unknown")))
-            title = html.escape(str(it.get("title", "")).strip())
-            url = html.escape(str(it.get("url", "")).strip())
-            parts.append(
+            company = self._esc_company(it.company)
+            title = html.escape(it.title.strip())
+            url = html.escape(it.url.strip())
+            emit(
                 f"<li><strong>{company}</strong>: <a href='{url}' target='_blank' rel='noopener'>{title}</a></li>"
             )
-        parts.append("</ul></section>")
-        return "\n".join(parts)
+        emit("</ul></section>")
 
     def _strip_sample_section(self, md: str) -> str:
         lines = md.splitlines()
@@ -186,25 +238,28 @@ class Renderer:
                 out.append(line)
         return "\n".join(out)
 
-    def _build_html(self, items: List[Dict[str, Any]], summary_text: Optional[str] = None) -> str:
-        head_tpl = read_text(self.cfg.templates_dir / "head.html")
-        head = head_tpl.replace("{{PAGE_TITLE}}", html.escape(self.cfg.page_title))
-        if self.cfg.page_noindex and 'name="robots"' not in head:
-            head = head.replace(
-                "</head>", '  <meta name="robots" content="noindex,nofollow">\n</head>'
-            )
+    def _write_html(
+        self, items: List[Item], out: TextIO, summary_text: Optional[str] = None
+    ) -> None:
+        # Parts are written newline-separated as they are produced (the section
+        # renderers write through emit too), so the page never exists as one string.
+        out.write(self._head)
+
+        def emit(part: str) -> None:
+            out.write("\n")
+            out.write(part)
 
-        parts: List[str] = []
-        parts.append(f"<h1>{html.escape(self.cfg.page_title)}</h1>")
-        parts.append(f"<div class='time'>Updated at {html.escape(now_iso_utc())}</div>")
+        emit("<body>")
+        emit(f"<h1>{self._title_html}</h1>")
+        emit(f"<div class='time'>Updated at {html.escape(now_iso_utc())}</div>")
 
-        parts.append(self._render_stats_cards(items))
-        parts.append(self._render_tabs_and_cards(items))
-        parts.append(self._render_sample_questions(items))
+        self._render_stats_cards(items, emit)
+        self._render_tabs_and_cards(items, emit)
+        self._render_sample_questions(items, emit)
 
-        parts.append("<section class='summary-panel'>")
-        parts.append("<h2>📊 Daily Summary</h2>")
-        parts.append("<div class='summary-content'>")
+        emit("<section class='summary-panel'>")
+        emit("<h2>📊 Daily Summary</h2>")
+        emit("<div class='summary-content'>")
         md_text: Optional[str] = None
         if summary_text and summary_text.strip():
             md_text = summary_text
@@ -214,16 +269,14 @@ class Renderer:
                 md_text = read_text(md_path)
         if md_text:
             clean = self._strip_sample_section(md_text)
-            parts.append(f"<pre class='summary-md'>{html.escape(clean)}</pre>")
+            emit(f"<pre class='summary-md'>{html.escape(clean)}</pre>")
         else:
-            parts.append("<em>No summary available.</em>")
-        parts.append("</div></section>")
+            emit("<em>No summary available.</em>")
+        emit("</div></section>")
 
-        tail_tpl = read_text(self.cfg.templates_dir / "tail.html")
-        return head + "\n<body>\n" + "\n".join([p for p in parts if p]) + "\n" + tail_tpl
+        emit(self._tail)
 
-    def write_html(self, items: List[Dict[str, Any]], summary_text: Optional[str] = None) -> None:
-        html_doc = self._build_html(items, summary_text=summary_text)
-        self.cfg.output_html.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cfg.output_html, "w", encoding="utf-8") as f:
-            f.write(html_doc)
+    def write_html(self, items: List[Item], summary_text: Optional[str] = None) -> None:
+        # Readers never see a half-written page if the run dies mid-render.
+        with open_text_atomic(self.cfg.output_html, buffering=1 << 16) as f:
+            self._write_html(items, f, summary_text=summary_text)
@@ -3,11 +3,24 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import os
+import re
 from collections import Counter, defaultdict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple, cast
+from typing import AbstractSet, Any, Dict, FrozenSet, List, Optional, Set, Tuple, cast
+
+from scripts.config_loader import (
+    json_dumps,
+    literal_alternation,
+    read_json,
+    write_bytes_atomic,
+    write_json_atomic,
+)
+from scripts.models import Item
 
 try:
     from openai import OpenAI
@@ -15,17 +28,25 @@ except ImportError:
     OpenAI = None
 
 
-def load_latest_items() -> List[Dict[str, Any]]:
-    with open("data/manifest.json", "r", encoding="utf-8") as f:
-        manifest: Dict[str, Any] = json.load(f)
+def load_latest_items() -> List[Item]:
+    manifest: Dict[str, Any] = read_json(Path("data/manifest.json"))
     json_path = Path(str(manifest["json_path"]))
-    with open(json_path, "r", encoding="utf-8") as f:
-        data: Dict[str, Any] = json.load(f)
-    items = cast(List[Dict[str, Any]], data.get("items", []))
-    return items
+    data: Dict[str, Any] = read_json(json_path)
+    return [Item.from_dict(d) for d in data.get("items", [])]
+
+
+CategorySnapshot = Tuple[Tuple[str, Tuple[str, ...]], ...]
+# (company_counts, company_cat_counts) as returned by build_trends.
+Trends = Tuple[Counter[str], Dict[str, Counter[str]]]
 
 
 def load_categories() -> Dict[str, List[str]]:
+    return {cat: list(kws) for cat, kws in _categories_snapshot()}
+
+
+@functools.lru_cache(maxsize=1)
+def _categories_snapshot() -> CategorySnapshot:
+    """categories.json (or the defaults), read once per process and frozen."""
     default: Dict[str, List[str]] = {
         "Graph": [
             "graph",
@@ -106,68 +127,115 @@ def load_categories() -> Dict[str, List[str]]:
         "Other": [],
     }
     cfg_path = Path("config/categories.json")
+    user_cfg: Any = None
     if cfg_path.exists():
         try:
             with open(cfg_path, "r", encoding="utf-8") as f:
                 user_cfg = json.load(f)
-            if isinstance(user_cfg, dict):
-                return cast(Dict[str, List[str]], user_cfg)
         except Exception:
             pass
-    return default
+    if isinstance(user_cfg, dict):
+        return _freeze(cast(Dict[str, List[str]], user_cfg))
+    return _freeze(default)
+
+
+def _freeze(categories: Dict[str, List[str]]) -> CategorySnapshot:
+    # A null keyword list is a category that matches nothing, like an empty one.
+    return tuple((cat, tuple(kws or ())) for cat, kws in categories.items())
 
 
 def normalize(text: str) -> str:
     return text.lower()
 
 
-def classify_item(title: str, snippet: str, categories: Dict[str, List[str]]) -> Set[str]:
-    text = normalize(f"{title} {snippet}")
-    hits: Set[str] = set()
-    for cat, kws in categories.items():
-        if not kws:
-            continue
+@dataclass(frozen=True)
+class CategoryMatcher:
+    """All category keywords compiled into one pattern, scanned once per item."""
+
+    rx: re.Pattern[str]
+    # Matched keyword -> categories of every keyword it contains, so a hit on
+    # "interval scheduling" also counts "interval" (substring semantics).
+    cats_for: Dict[str, FrozenSet[str]]
+
+    @classmethod
+    def build(cls, categories: Dict[str, List[str]]) -> "CategoryMatcher":
+        return _build_matcher(_freeze(categories))
+
+
+@functools.lru_cache(maxsize=4)
+def _build_matcher(categories: CategorySnapshot) -> CategoryMatcher:
+    kw_cats: Dict[str, Set[str]] = {"": set()}
+    for cat, kws in categories:
         for kw in kws:
-            if kw.lower() in text:
-                hits.add(cat)
-                break
-    if not hits:
-        hits.add("Other")
-    return hits
+            kw_cats.setdefault(kw.lower(), set()).add(cat)
+    words = [kw for kw in kw_cats if kw]
+    cats_for = {
+        kw: frozenset().union(*(cats for k, cats in kw_cats.items() if k in kw)) for kw in kw_cats
+    }
+    # A lookahead match is zero-width, so finditer tries every position and
+    # overlapping keywords ("sliding window function") are all found.
+    rx = re.compile("(?=(" + literal_alternation(words) + "))")
+    return CategoryMatcher(rx=rx, cats_for=cats_for)
+
+
+OTHER: FrozenSet[str] = frozenset({"Other"})
+
+
+def classify_item(title: str, snippet: str, matcher: CategoryMatcher) -> AbstractSet[str]:
+    text = normalize(f"{title} {snippet}")
+    cats_for = matcher.cats_for
+    # An empty keyword is in every text; its categories always hit.
+    hits: Set[str] = set(cats_for[""])
+    for m in matcher.rx.finditer(text):
+        hits |= cats_for[m.group(1)]
+    return hits or OTHER
 
 
 def build_trends(
-    items: List[Dict[str, Any]],
+    items: List[Item],
     categories: Dict[str, List[str]],
-) -> Tuple[Counter[str], Dict[str, Counter[str]]]:
+) -> Trends:
     company_counts: Counter[str] = Counter()
     company_cat_counts: Dict[str, Counter[str]] = defaultdict(Counter)
+    matcher = CategoryMatcher.build(categories)
+    # Reposts share title and snippet under different URLs; classify each text once.
+    memo: Dict[Tuple[str, str], AbstractSet[str]] = {}
     for it in items:
-        company = str(it.get("company", "Unknown"))
-        title = str(it.get("title", ""))
-        snippet = str(it.get("snippet", ""))
+        company = it.company
         company_counts[company] += 1
-        cats = classify_item(title, snippet, categories)
+        key = (it.title, it.snippet)
+        cats = memo.get(key)
+        if cats is None:
+            cats = memo[key] = classify_item(it.title, it.snippet, matcher)
+        cat_counts = company_cat_counts[company]
         for c in cats:
-            company_cat_counts[company][c] += 1
+            cat_counts[c] += 1
     return company_counts, company_cat_counts
 
 
-def render_rules_summary(items: List[Dict[str, Any]]) -> str:
-    categories = load_categories()
-    company_counts, company_cat_counts = build_trends(items, categories)
+EMPTY_SUMMARY = "# Daily Interview Feed Summary\n\n_No items in feed._\n"
+
+
+def render_rules_summary(items: List[Item], trends: Optional[Trends] = None) -> str:
+    if not items:
+        return EMPTY_SUMMARY
+    if trends is None:
+        trends = build_trends(items, load_categories())
+    company_counts, company_cat_counts = trends
+    # Sorted once; most_common(10) is documented to equal this list's first 10.
+    ranked = company_counts.most_common()
 
     lines: List[str] = []
     lines.append("# Daily Interview Feed Summary")
     lines.append("")
     if company_counts:
         lines.append("## Top Companies by Mentions")
-        for company, cnt in company_counts.most_common(10):
+        for company, cnt in ranked[:10]:
             lines.append(f"- {company}: {cnt} questions")
         lines.append("")
     if company_cat_counts:
         lines.append("## Trend by Company")
-        for company, _ in company_counts.most_common():
+        for company, _ in ranked:
             cat_counter = company_cat_counts[company]
             if not cat_counter:
                 continue
@@ -177,25 +245,30 @@ def render_rules_summary(items: List[Dict[str, Any]]) -> str:
         lines.append("")
     lines.append("## Sample Questions")
     for it in items[:5]:
-        title = str(it.get("title", "")).strip()
-        url = str(it.get("url", "")).strip()
-        company = str(it.get("company", "Unknown"))
-        lines.append(f"- {company}: {title} ({url})")
+        lines.append(f"- {it.company}: {it.title.strip()} ({it.url.strip()})")
     lines.append("")
     return "\n".join(lines)
 
 
-def render_openai_summary(items: List[Dict[str, Any]], api_key: str) -> str:
+OPENAI_MODEL = "gpt-4o-mini"
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_client(api_key: str) -> Any:
+    # The client sets up its HTTP pool and TLS context once; reuse it across calls.
+    return OpenAI(api_key=api_key)
+
+
+def render_openai_summary(items: List[Item], api_key: str, trends: Optional[Trends] = None) -> str:
+    # Nothing to summarize: don't spend an API call on it.
+    if not items:
+        return EMPTY_SUMMARY
     if OpenAI is None:
         raise RuntimeError("openai package not installed")
-    categories = load_categories()
-    company_counts, company_cat_counts = build_trends(items, categories)
-    bullets = "\n".join(
-        [
-            f"- {str(it.get('company', 'Unknown'))}: {str(it.get('title', '')).strip()}"
-            for it in items[:15]
-        ]
-    )
+    if trends is None:
+        trends = build_trends(items, load_categories())
+    company_counts, company_cat_counts = trends
+    bullets = "\n".join([f"- {it.company}: {it.title.strip()}" for it in items[:15]])
     trend_lines: List[str] = []
     for company, _ in company_counts.most_common():
         cat_counter = company_cat_counts[company]
@@ -204,7 +277,7 @@ def render_openai_summary(items: List[Dict[str, Any]], api_key: str) -> str:
         cats = ", ".join([f"{cat}({cnt})" for cat, cnt in cat_counter.most_common(5)])
         trend_lines.append(f"{company}: {cats}")
     trend_text = "\n".join(trend_lines)
-    client = OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
     prompt = f"""
 You are an assistant that writes a concise daily report of interview questions found in a forum feed.
 First, give a short overview of top companies by volume. Then highlight per-company topic trends (categories and counts).
@@ -218,37 +291,79 @@ Examples:
 
 Write a clean Markdown report with headings and bullet points. Keep it under 300 words.
 """
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+    # Streamed so tokens are read as they are generated instead of after the
+    # whole completion; the text is assembled once at the end.
+    stream = client.chat.completions.create(
+        model=OPENAI_MODEL,
         messages=[{"role": "user", "content": prompt}],
         max_tokens=600,
         temperature=0.3,
+        stream=True,
     )
-    return str(resp.choices[0].message.content or "")
+    parts: List[str] = []
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+    return "".join(parts)
+
+
+SUMMARY_DIGEST_PATH = Path(".cache/summary.digest")
+# Part of the digest: bump when the rules template or the OpenAI prompt changes,
+# so cached outputs from the old summarizer are not kept for unchanged items.
+SUMMARY_VERSION = 1
+
+
+def inputs_digest(items: List[Item], categories: Dict[str, List[str]], use_openai: bool) -> str:
+    """Fingerprint of everything summary.md and data/summary.json are derived from."""
+    payload = {
+        "items": [it.to_dict() for it in items],
+        "categories": categories,
+        "openai": OPENAI_MODEL if use_openai else None,
+        "version": SUMMARY_VERSION,
+    }
+    return hashlib.blake2b(json_dumps(payload), digest_size=16).hexdigest()
 
 
 def main() -> None:
     items = load_latest_items()
+    categories = load_categories()
     api_key = os.getenv("OPENAI_API_KEY")
+    # Scheduled runs often see the same items again; skip the classify + render
+    # (and the OpenAI call) when outputs from identical inputs are still on disk.
+    digest = inputs_digest(items, categories, bool(api_key))
+    if (
+        Path("summary.md").exists()
+        and Path("data/summary.json").exists()
+        and SUMMARY_DIGEST_PATH.exists()
+        and SUMMARY_DIGEST_PATH.read_text(encoding="utf-8") == digest
+    ):
+        print("[summary] Inputs unchanged; keeping summary.md and data/summary.json")
+        return
+    # Classify once; the summary text and summary.json share the same trends.
+    trends = build_trends(items, categories)
+    openai_failed = False
     if api_key:
         try:
-            summary = render_openai_summary(items, api_key)
+            summary = render_openai_summary(items, api_key, trends)
         except Exception:
-            summary = render_rules_summary(items)
+            summary = render_rules_summary(items, trends)
+            openai_failed = True
     else:
-        summary = render_rules_summary(items)
-    with open("summary.md", "w", encoding="utf-8") as f:
-        f.write(summary)
-    categories = load_categories()
-    company_counts, company_cat_counts = build_trends(items, categories)
+        summary = render_rules_summary(items, trends)
+    write_bytes_atomic(Path("summary.md"), summary.encode("utf-8"))
+    company_counts, company_cat_counts = trends
     payload = {
         "company_counts": dict(company_counts),
         "company_category_counts": {k: dict(v) for k, v in company_cat_counts.items()},
         "top_companies": company_counts.most_common(10),
     }
-    Path("data").mkdir(parents=True, exist_ok=True)
-    with open("data/summary.json", "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    write_json_atomic(Path("data/summary.json"), payload)
+    if openai_failed:
+        # summary.md is the rules fallback, not what the digest promises; drop
+        # the digest so the next run tries OpenAI again instead of keeping it.
+        SUMMARY_DIGEST_PATH.unlink(missing_ok=True)
+    else:
+        write_bytes_atomic(SUMMARY_DIGEST_PATH, digest.encode("utf-8"))
 
 
 if __name__ == "__main__":
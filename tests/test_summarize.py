@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from scripts import summarize
+from scripts.models import Item
+
+
+class NullKeywordListTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        summarize._categories_snapshot.cache_clear()
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+        summarize._categories_snapshot.cache_clear()
+
+    def test_config_with_null_list_is_kept(self) -> None:
+        Path("config").mkdir()
+        Path("config/categories.json").write_text(
+            json.dumps({"Graphs": ["graph", "bfs"], "Misc": None}), encoding="utf-8"
+        )
+        self.assertEqual(summarize.load_categories(), {"Graphs": ["graph", "bfs"], "Misc": []})
+
+    def test_build_trends_skips_null_list(self) -> None:
+        items = [Item(title="BFS on a grid", url="u", snippet="", company="Acme", first_seen="")]
+        _, cat_counts = summarize.build_trends(items, {"Graphs": ["bfs"], "Misc": None})  # type: ignore[dict-item]
+        self.assertEqual(dict(cat_counts["Acme"]), {"Graphs": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()